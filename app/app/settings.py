@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -94,6 +95,8 @@ DATABASES = {
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASSWORD"),
         "OPTIONS": {},
+        # Build the test database straight from the models.
+        "TEST": {"MIGRATE": False},
     }
 }
 
@@ -123,6 +126,13 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+TESTING = "test" in sys.argv or "pytest" in sys.modules
+
+if TESTING:
+    # Test users don't need a slow, brute-force resistant hash.
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -2,10 +2,18 @@
 Django admin Customization
 """
 from django.contrib import admin  # noqa
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import (
+    Count,
+    IntegerField,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
-from .models import Recipe, User
+from .models import Ingredient, Recipe, Tag, User
 
 
 class UserAdmin(BaseUserAdmin):
@@ -13,6 +21,7 @@ class UserAdmin(BaseUserAdmin):
 
     ordering = ["id"]
     list_display = ["email", "name"]
+    search_fields = ["email", "name"]
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         (
@@ -41,5 +50,77 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+def recipe_relation_count(through):
+    """Count a recipe's rows in an M2M through table as a subquery"""
+    counts = (
+        through.objects.filter(recipe_id=OuterRef("pk"))
+        .order_by()
+        .values("recipe_id")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class RecipeChangeList(ChangeList):
+    """Recipe changelist that counts relations for the shown page only"""
+
+    def get_results(self, request):
+        super().get_results(request)
+        # Annotating after pagination keeps the subqueries out of the
+        # paginator's COUNT(*) queries.
+        self.result_list = self.result_list.annotate(
+            _tags_count=recipe_relation_count(Recipe.tags.through),
+            _ingredients_count=recipe_relation_count(
+                Recipe.ingredients.through
+            ),
+        )
+
+
+class RecipeAdmin(admin.ModelAdmin):
+    """Define the admin pages for recipes"""
+
+    list_display = [
+        "title",
+        "user",
+        "time_minutes",
+        "price",
+        "tags_count",
+        "ingredients_count",
+    ]
+    list_select_related = ["user"]
+    autocomplete_fields = ["user", "tags", "ingredients"]
+
+    def get_queryset(self, request):
+        """Fetch the recipe author along with the recipe"""
+        return super().get_queryset(request).select_related("user")
+
+    def get_changelist(self, request, **kwargs):
+        """Use the changelist that annotates relation counts per page"""
+        return RecipeChangeList
+
+    @admin.display(description=_("Tags"))
+    def tags_count(self, obj):
+        return obj._tags_count
+
+    @admin.display(description=_("Ingredients"))
+    def ingredients_count(self, obj):
+        return obj._ingredients_count
+
+
+class TagAdmin(admin.ModelAdmin):
+    """Define the admin pages for tags"""
+
+    search_fields = ["name"]
+
+
+class IngredientAdmin(admin.ModelAdmin):
+    """Define the admin pages for ingredients"""
+
+    search_fields = ["name"]
+
+
 admin.site.register(User, UserAdmin)
-admin.site.register(Recipe)
+admin.site.register(Recipe, RecipeAdmin)
+admin.site.register(Tag, TagAdmin)
+admin.site.register(Ingredient, IngredientAdmin)
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-15 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_recipe_image"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(
+                fields=["user", "name"], name="core_ingred_user_id_b96ee8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["user", "-id"], name="core_recipe_user_id_98373e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tag",
+            index=models.Index(
+                fields=["user", "name"], name="core_tag_user_id_74e398_idx"
+            ),
+        ),
+    ]
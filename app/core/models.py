@@ -19,7 +19,7 @@ def recipe_image_path(instance, filename):
     ext = os.path.splitext(filename)[1]
     filename = f"{uuid.uuid4()}{ext}"
 
-    return os.path.join("uploads", "recipe", filename)
+    return os.path.join("uploads", "recipe", filename[:2], filename)
 
 
 class UserManager(BaseUserManager):
@@ -80,6 +80,7 @@ class Recipe(models.Model):
     class Meta:
         verbose_name = _("Recipe")
         verbose_name_plural = _("Recipes")
+        indexes = [models.Index(fields=["user", "-id"])]
 
     def __str__(self):
         return self.title
@@ -99,6 +100,7 @@ class Tag(models.Model):
     class Meta:
         verbose_name = _("Tag")
         verbose_name_plural = _("Tags")
+        indexes = [models.Index(fields=["user", "name"])]
 
     def __str__(self):
         return self.name
@@ -117,6 +119,7 @@ class Ingredient(models.Model):
     class Meta:
         verbose_name = _("Ingredient")
         verbose_name_plural = _("Ingredients")
+        indexes = [models.Index(fields=["user", "name"])]
 
     def __str__(self):
         return self.name
@@ -1,6 +1,11 @@
 """Tests for the admin modifications"""
+from decimal import Decimal
+
+from core.models import Recipe, Tag
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
@@ -39,3 +44,87 @@ class AdminSiteTest(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def test_recipe_list(self):
+        """Test that recipes are listed with their author and counts"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title="Sample recipe",
+            time_minutes=5,
+            price=Decimal("5.50"),
+        )
+        recipe.tags.add(
+            Tag.objects.create(user=self.user, name="Vegan"),
+            Tag.objects.create(user=self.user, name="Dessert"),
+        )
+        url = reverse("admin:core_recipe_changelist")
+        res = self.client.get(url)
+
+        self.assertContains(res, "Sample recipe")
+        self.assertContains(res, self.user.email)
+        self.assertContains(
+            res, '<td class="field-tags_count">2</td>', html=True
+        )
+        self.assertContains(
+            res, '<td class="field-ingredients_count">0</td>', html=True
+        )
+
+    def test_recipe_list_skips_relation_prefetch(self):
+        """Test the recipe list doesn't load tag or ingredient rows"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title="Sample recipe",
+            time_minutes=5,
+            price=Decimal("5.50"),
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Vegan"))
+        url = reverse("admin:core_recipe_changelist")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+
+        for query in ctx.captured_queries:
+            self.assertNotIn('FROM "core_tag"', query["sql"])
+            self.assertNotIn('FROM "core_ingredient"', query["sql"])
+
+    def test_recipe_list_counts_page_only(self):
+        """Test relation counts stay out of the paginator's count query"""
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                user=self.user,
+                title=f"Recipe {i}",
+                time_minutes=5,
+                price=Decimal("5.50"),
+            )
+            for i in range(101)
+        )
+        recipes[0].tags.add(Tag.objects.create(user=self.user, name="Vegan"))
+        url = reverse("admin:core_recipe_changelist")
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, {"p": 2, "o": "-1"})
+
+        self.assertContains(
+            res, '<td class="field-tags_count">1</td>', html=True
+        )
+        count_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if "COUNT(*)" in query["sql"]
+        ]
+        self.assertTrue(count_queries)
+        for sql in count_queries:
+            self.assertNotIn("core_recipe_tags", sql)
+            self.assertNotIn("core_recipe_ingredients", sql)
+
+    def test_recipe_page(self):
+        """Test that the recipe change page works"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title="Sample recipe",
+            time_minutes=5,
+            price=Decimal("5.50"),
+        )
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Vegan"))
+        url = reverse("admin:core_recipe_change", args=[recipe.id])
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
@@ -103,4 +103,4 @@ class ModelTest(TestCase):
         mock_uuid.return_value = uuid
         file_path = models.recipe_image_path(None, "example.jpg")
 
-        self.assertEqual(file_path, f"uploads/recipe/{uuid}.jpg")
+        self.assertEqual(file_path, f"uploads/recipe/te/{uuid}.jpg")
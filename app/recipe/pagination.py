@@ -0,0 +1,20 @@
+"""
+Pagination for the recipe app.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Paginate recipes newest first"""
+
+    ordering = "-id"
+    page_size = 50
+
+
+class RecipeAttrCursorPagination(CursorPagination):
+    """Paginate tags and ingredients in reverse name order"""
+
+    # Names aren't unique per user, so id breaks ties and keeps the
+    # order of equal names stable across pages.
+    ordering = ("-name", "-id")
+    page_size = 50
@@ -1,8 +1,11 @@
 """
 Serializers for recipe api
 """
+from decimal import Decimal
+
 from core.models import Ingredient, Recipe, Tag
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -85,6 +88,37 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class PriceField(serializers.DecimalField):
+    """Decimal field that renders already quantized values directly."""
+
+    def to_representation(self, value):
+        coerce_to_string = getattr(
+            self, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+        )
+        # Prices read from the DB already have the column's scale, so the
+        # Decimal context round-trip done by quantize() can be skipped.
+        if (
+            coerce_to_string
+            and not self.localize
+            and isinstance(value, Decimal)
+            and value.as_tuple().exponent == -self.decimal_places
+        ):
+            return f"{value:f}"
+        return super().to_representation(value)
+
+
+class RecipeListSerializer(serializers.Serializer):
+    """Hand-declared, read-only serializer for listing recipes."""
+
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    time_minutes = serializers.IntegerField(read_only=True)
+    price = PriceField(max_digits=5, decimal_places=2, read_only=True)
+    link = serializers.CharField(read_only=True)
+    tags = TagSerializer(many=True, read_only=True)
+    ingredients = IngredientSerializer(many=True, read_only=True)
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for recipe details."""
 
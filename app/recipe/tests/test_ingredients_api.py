@@ -7,16 +7,19 @@ from core.models import Ingredient, Recipe
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
-from recipe.serializers import IngredientSerializer
 from rest_framework import status
 from rest_framework.test import APIClient
 
 INGREDIENTS_URL = reverse("recipe:ingredient-list")
+# Reversed once with a placeholder id that detail_url() swaps out.
+INGREDIENT_DETAIL_URL = reverse("recipe:ingredient-detail", args=[0]).replace(
+    "/0/", "/{}/"
+)
 
 
 def detail_url(ingredient_id):
     """Create and return an ingredient detail url"""
-    return reverse("recipe:ingredient-detail", args=[ingredient_id])
+    return INGREDIENT_DETAIL_URL.format(ingredient_id)
 
 
 def create_user(email="test@user.com", password="test123"):
@@ -24,6 +27,13 @@ def create_user(email="test@user.com", password="test123"):
     return get_user_model().objects.create_user(email, password)
 
 
+def create_ingredients(user, *names):
+    """Create and return ingredients for user in a single query"""
+    return Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=name) for name in names]
+    )
+
+
 class PublicRecipeApiTests(TestCase):
     """Test unauthenticated api requests"""
 
@@ -40,41 +50,75 @@ class PublicRecipeApiTests(TestCase):
 class PrivateRecipeApiTests(TestCase):
     """Test authenticated api requests"""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
     def setUp(self):
         self.client = APIClient()
-        self.user = create_user()
         self.client.force_authenticate(user=self.user)
 
     def test_list_ingredients(self):
         """test that list of ingredients works"""
-        Ingredient.objects.create(user=self.user, name="egg")
-        Ingredient.objects.create(user=self.user, name="olives")
-        Ingredient.objects.create(user=self.user, name="sugar")
-        res = self.client.get(INGREDIENTS_URL)
-
-        ingredients = Ingredient.objects.all().order_by("-name")
-        serializer = IngredientSerializer(ingredients, many=True)
+        egg, olives, sugar = create_ingredients(
+            self.user, "egg", "olives", "sugar"
+        )
+        with self.assertNumQueries(1):
+            res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {"id": sugar.id, "name": "sugar"},
+                {"id": olives.id, "name": "olives"},
+                {"id": egg.id, "name": "egg"},
+            ],
+        )
 
     def test_list_ingredients_self_user(self):
         """test that list of ingredients works only for the logged in user"""
         user2 = create_user(email="test2@example.com")
 
-        Ingredient.objects.create(user=user2, name="egg")
-        Ingredient.objects.create(user=user2, name="olives")
-        Ingredient.objects.create(user=self.user, name="sugar")
-        Ingredient.objects.create(user=self.user, name="tea")
+        create_ingredients(user2, "egg", "olives")
+        sugar, tea = create_ingredients(self.user, "sugar", "tea")
         res = self.client.get(INGREDIENTS_URL)
 
-        ingredients = (
-            Ingredient.objects.all().filter(user=self.user).order_by("-name")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [{"id": tea.id, "name": "tea"}, {"id": sugar.id, "name": "sugar"}],
         )
-        serializer = IngredientSerializer(ingredients, many=True)
+
+    def test_list_ingredients_paginated(self):
+        """Test that the ingredients list is split into cursor pages"""
+        names = [f"ingredient {i:02}" for i in range(51)]
+        create_ingredients(self.user, *names)
+
+        res = self.client.get(INGREDIENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 50)
+        self.assertIsNotNone(res.data["next"])
+
+        res = self.client.get(res.data["next"])
+
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(
+            [i["name"] for i in res.data["results"]], ["ingredient 00"]
+        )
+
+    def test_list_ingredients_paginated_name_ties(self):
+        """Test that ingredients sharing a name are paged exactly once"""
+        ingredients = create_ingredients(self.user, *["salt"] * 51)
+
+        res = self.client.get(INGREDIENTS_URL)
+        ids = [i["id"] for i in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        ids += [i["id"] for i in res.data["results"]]
+
+        expected = sorted((i.id for i in ingredients), reverse=True)
+        self.assertEqual(ids, expected)
 
     def test_update_ingredients(self):
         ingredient = Ingredient.objects.create(user=self.user, name="egg")
@@ -94,14 +138,13 @@ class PrivateRecipeApiTests(TestCase):
         )
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
 
-        ingredients = Ingredient.objects.filter(user=self.user)
-        self.assertFalse(ingredients.exists())
+        self.assertFalse(Ingredient.objects.filter(pk=ingredient.id).exists())
 
     def test_list_ingredients_assigned_to_recipes(self):
         """Test filter ingredients in use only"""
         i1 = Ingredient.objects.create(user=self.user, name="ingredient 1")
         i2 = Ingredient.objects.create(user=self.user, name="ingredient 2")
-        i3 = Ingredient.objects.create(user=self.user, name="ingredient 3")
+        Ingredient.objects.create(user=self.user, name="ingredient 3")
         r1 = Recipe.objects.create(
             user=self.user,
             title="Recipe one",
@@ -121,12 +164,10 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.get(INGREDIENTS_URL, params)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        s1 = IngredientSerializer(i1)
-        s2 = IngredientSerializer(i2)
-        s3 = IngredientSerializer(i3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertEqual(
+            {ingredient["id"] for ingredient in res.data["results"]},
+            {i1.id, i2.id},
+        )
 
     def test_filtered_ingredients_unique(self):
         i1 = Ingredient.objects.create(user=self.user, name="ingredient 1")
@@ -148,6 +189,7 @@ class PrivateRecipeApiTests(TestCase):
         r2.ingredients.add(i1)
 
         params = {"assigned_only": 1}
-        res = self.client.get(INGREDIENTS_URL, params)
+        with self.assertNumQueries(1):
+            res = self.client.get(INGREDIENTS_URL, params)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
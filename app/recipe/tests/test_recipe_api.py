@@ -1,12 +1,13 @@
 """
 Tests for the recipe API
 """
-import os
-import tempfile
+import io
 from decimal import Decimal
+from types import MappingProxyType
 
 from core.models import Ingredient, Recipe, Tag
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.urls import reverse
 from PIL import Image
@@ -15,33 +16,54 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 RECIPES_URL = reverse("recipe:recipe-list")
+# Reversed once with a placeholder id that the URL helpers swap out.
+RECIPE_DETAIL_URL = reverse("recipe:recipe-detail", args=[0]).replace(
+    "/0/", "/{}/"
+)
+IMAGE_UPLOAD_URL = reverse("recipe:recipe-upload-image", args=[0]).replace(
+    "/0/", "/{}/"
+)
+
+SAMPLE_RECIPE = MappingProxyType(
+    {
+        "title": "Sample recipe title",
+        "description": "Sample recipe description",
+        "time_minutes": 22,
+        "price": Decimal("5.25"),
+        "link": "http://example.com/recipe.pdf",
+    }
+)
 
 
 def detail_url(recipe_id):
     """Create and return a recipe detail url"""
-    return reverse("recipe:recipe-detail", args=[recipe_id])
+    return RECIPE_DETAIL_URL.format(recipe_id)
 
 
 def image_upload_url(recipe_id):
     """Create and return an image upload URL."""
-    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+    return IMAGE_UPLOAD_URL.format(recipe_id)
+
+
+def build_recipe(user, **params):
+    """Build and return an unsaved sample recipe."""
+    return Recipe(user=user, **{**SAMPLE_RECIPE, **params})
 
 
 def create_recipe(user, **params):
     """Create and return a sample recipe."""
-    defaults = {
-        "title": "Sample recipe title",
-        "description": "Sample recipe description",
-        "time_minutes": 22,
-        "price": Decimal("5.25"),
-        "link": "http://example.com/recipe.pdf",
-    }
-    defaults.update(params)
-
-    recipe = Recipe.objects.create(user=user, **defaults)
+    recipe = build_recipe(user, **params)
+    recipe.save()
     return recipe
 
 
+def create_recipes(user, count=1, **params):
+    """Create and return count sample recipes in a single query."""
+    return Recipe.objects.bulk_create(
+        [build_recipe(user, **params) for _ in range(count)]
+    )
+
+
 def create_user(**params):
     """Create and return a new user"""
     return get_user_model().objects.create_user(**params)
@@ -50,8 +72,7 @@ def create_user(**params):
 class PublicRecipeApiTests(TestCase):
     """Test unauthenticated api requests"""
 
-    def setUp(self) -> None:
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         """Test auth is required to continue"""
@@ -63,28 +84,38 @@ class PublicRecipeApiTests(TestCase):
 class PrivateRecipeApiTests(TestCase):
     """Test authenticated api requests"""
 
-    def setUp(self) -> None:
-        self.user = create_user(
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email="test@example.com",
             password="testpass123",
             name="Test User",
         )
-        self.client = APIClient()
+
+    def setUp(self) -> None:
         self.client.force_authenticate(user=self.user)
 
     def test_retrieve_recipes(self):
         """Test retrieving a list of recipes"""
 
-        create_recipe(self.user)
-        create_recipe(self.user)
+        create_recipes(self.user, count=2)
 
-        res = self.client.get(RECIPES_URL)
+        # One query for the page, one prefetch each for tags/ingredients.
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
 
-        recipes = Recipe.objects.all().order_by("-id")
-        serializer = RecipeSerializer(recipes, many=True)
+        expected_ids = list(
+            Recipe.objects.filter(user=self.user)
+            .order_by("-id")
+            .values_list("id", flat=True)
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(
+            [recipe["id"] for recipe in res.data["results"]], expected_ids
+        )
 
     def test_retrieve_recipes_limited_to_user(self):
         """Test retrieving recipes are limited to current logged in user"""
@@ -94,17 +125,21 @@ class PrivateRecipeApiTests(TestCase):
             password="testpass123",
             name="Test User 2",
         )
-        create_recipe(self.user)
-        create_recipe(self.user)
+        create_recipes(self.user, count=2)
         create_recipe(user_2)
 
         res = self.client.get(RECIPES_URL)
 
-        recipes = Recipe.objects.filter(user=self.user).order_by("-id")
-        serializer = RecipeSerializer(recipes, many=True)
+        expected_ids = list(
+            Recipe.objects.filter(user=self.user)
+            .order_by("-id")
+            .values_list("id", flat=True)
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(
+            [recipe["id"] for recipe in res.data["results"]], expected_ids
+        )
 
     def test_get_recipe_detail(self):
         """Test get a recipe detail"""
@@ -120,13 +155,7 @@ class PrivateRecipeApiTests(TestCase):
 
     def test_post_recipe_detail(self):
         """Test post a new recipe"""
-        payload = {
-            "title": "Sample recipe title",
-            "description": "Sample recipe description",
-            "time_minutes": 22,
-            "price": Decimal("5.25"),
-            "link": "http://example.com/recipe.pdf",
-        }
+        payload = dict(SAMPLE_RECIPE)
         res = self.client.post(RECIPES_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -138,16 +167,9 @@ class PrivateRecipeApiTests(TestCase):
 
     def test_partial_update(self):
         """Test partial update in a recipe"""
-        original = "http://example.com/recipe.pdf"
-        payload = {
-            "title": "Sample recipe title",
-            "description": "Sample recipe description",
-            "time_minutes": 22,
-            "price": Decimal("5.25"),
-            "link": original,
-        }
+        original = SAMPLE_RECIPE["link"]
 
-        res = self.client.post(RECIPES_URL, payload)
+        res = self.client.post(RECIPES_URL, dict(SAMPLE_RECIPE))
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
@@ -247,17 +269,19 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        recipes = list(
+            Recipe.objects.filter(user=self.user).prefetch_related("tags")
+        )
+        self.assertEqual(len(recipes), 1)
 
         recipe = recipes[0]
-        self.assertEqual(recipe.tags.count(), 2)
+        tags = recipe.tags.all()
+        self.assertEqual(len(tags), 2)
 
-        for tag in payload["tags"]:
-            exist = recipe.tags.filter(
-                name=tag["name"], user=self.user
-            ).exists()
-            self.assertTrue(exist)
+        self.assertEqual(
+            {(tag.name, tag.user_id) for tag in tags},
+            {(tag["name"], self.user.id) for tag in payload["tags"]},
+        )
 
     def test_create_recipe_with_existing_tags(self):
         """Creating a recipe with existing tags"""
@@ -272,19 +296,21 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        recipes = list(
+            Recipe.objects.filter(user=self.user).prefetch_related("tags")
+        )
+        self.assertEqual(len(recipes), 1)
 
         recipe = recipes[0]
-        self.assertEqual(recipe.tags.count(), 2)
+        tags = recipe.tags.all()
+        self.assertEqual(len(tags), 2)
 
-        self.assertIn(tag, recipe.tags.all())
+        self.assertIn(tag.id, {t.id for t in tags})
 
-        for tag in payload["tags"]:
-            exist = recipe.tags.filter(
-                name=tag["name"], user=self.user
-            ).exists()
-            self.assertTrue(exist)
+        self.assertEqual(
+            {(tag.name, tag.user_id) for tag in tags},
+            {(tag["name"], self.user.id) for tag in payload["tags"]},
+        )
 
     def test_create_tag_on_update(self):
         """create the tags when updating a recipe"""
@@ -295,7 +321,9 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         new_tag = Tag.objects.get(user=self.user, name="Lunch")
-        self.assertIn(new_tag, recipe.tags.all())
+        self.assertEqual(
+            res.data["tags"], [{"id": new_tag.id, "name": "Lunch"}]
+        )
 
     def test_update_recipe_assign_tag(self):
         """Test assigning an existing tag when updating a recipe,"""
@@ -310,8 +338,9 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.patch(url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(tag_two, recipe.tags.all())
-        self.assertNotIn(tag_one, recipe.tags.all())
+        tag_ids = set(recipe.tags.values_list("id", flat=True))
+        self.assertIn(tag_two.id, tag_ids)
+        self.assertNotIn(tag_one.id, tag_ids)
 
     def test_delete_recipe_tags(self):
         """Test clearing a recipe tags"""
@@ -325,7 +354,7 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.patch(url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(recipe.tags.count(), 0)
+        self.assertEqual(res.data["tags"], [])
 
     def test_create_recipe_with_ingredients(self):
         """Test create recipe with ingredients ok"""
@@ -344,17 +373,19 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
-
-        recipe = recipes[0]
-        self.assertEqual(recipe.ingredients.count(), 2)
+        recipes = list(
+            Recipe.objects.filter(user=self.user).prefetch_related(
+                "ingredients"
+            )
+        )
+        self.assertEqual(len(recipes), 1)
 
-        for ingredient in payload["ingredients"]:
-            exist = recipe.ingredients.filter(
-                name=ingredient["name"], user=self.user
-            ).exists()
-            self.assertTrue(exist)
+        ingredients = recipes[0].ingredients.all()
+        self.assertEqual(len(ingredients), 2)
+        self.assertEqual(
+            {(i.name, i.user_id) for i in ingredients},
+            {(i["name"], self.user.id) for i in payload["ingredients"]},
+        )
 
     def test_create_recipe_with_existing_ingredients(self):
         """
@@ -377,19 +408,21 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
         ingredients = Ingredient.objects.filter(user=self.user)
-        recipe = Recipe.objects.filter(user=self.user)
+        recipes = list(
+            Recipe.objects.filter(user=self.user).prefetch_related(
+                "ingredients"
+            )
+        )
 
-        self.assertEqual(recipe.count(), 1)
+        self.assertEqual(len(recipes), 1)
         self.assertEqual(ingredients.count(), 1)
-        self.assertEqual(recipe[0].ingredients.count(), 1)
 
-        for ingredient in payload["ingredients"]:
-            e = (
-                recipe[0]
-                .ingredients.filter(user=self.user, name=ingredient["name"])
-                .exists()
-            )
-            self.assertTrue(e)
+        recipe_ingredients = recipes[0].ingredients.all()
+        self.assertEqual(len(recipe_ingredients), 1)
+        self.assertEqual(
+            {(i.name, i.user_id) for i in recipe_ingredients},
+            {(i["name"], self.user.id) for i in payload["ingredients"]},
+        )
 
     def test_create_ingredients_on_update(self):
         """Test create the ingredient when updating recipe"""
@@ -406,7 +439,9 @@ class PrivateRecipeApiTests(TestCase):
         ingredient = Ingredient.objects.get(
             name="ingredient one", user=self.user
         )
-        self.assertIn(ingredient, recipe.ingredients.all())
+        self.assertIn(
+            ingredient.id, recipe.ingredients.values_list("id", flat=True)
+        )
 
     def test_update_recipe_assign_ingredient(self):
         recipe = create_recipe(user=self.user)
@@ -415,7 +450,9 @@ class PrivateRecipeApiTests(TestCase):
         )
         recipe.ingredients.add(ingredient_one)
 
-        self.assertIn(ingredient_one, recipe.ingredients.all())
+        self.assertIn(
+            ingredient_one.id, recipe.ingredients.values_list("id", flat=True)
+        )
 
         ingredient_two = Ingredient.objects.create(
             user=self.user, name="ingredient two"
@@ -430,8 +467,9 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.patch(url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertNotIn(ingredient_one, recipe.ingredients.all())
-        self.assertIn(ingredient_two, recipe.ingredients.all())
+        ingredient_ids = set(recipe.ingredients.values_list("id", flat=True))
+        self.assertNotIn(ingredient_one.id, ingredient_ids)
+        self.assertIn(ingredient_two.id, ingredient_ids)
 
     def test_clear_ingredients(self):
         """Test that passing an empty array clears the ingredients"""
@@ -444,15 +482,19 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.patch(url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(recipe.ingredients.count(), 0)
+        self.assertEqual(res.data["ingredients"], [])
 
     def test_filter_by_tags(self):
         """Test that filtering tags works"""
-        r1 = create_recipe(user=self.user, title="recipe1")
-        r2 = create_recipe(user=self.user, title="recipe2")
-        r3 = create_recipe(user=self.user, title="recipe3")
-        t1 = Tag.objects.create(user=self.user, name="tag1")
-        t2 = Tag.objects.create(user=self.user, name="tag2")
+        r1, r2, r3 = Recipe.objects.bulk_create(
+            [build_recipe(self.user, title=f"recipe{i}") for i in (1, 2, 3)]
+        )
+        t1, t2 = Tag.objects.bulk_create(
+            [
+                Tag(user=self.user, name="tag1"),
+                Tag(user=self.user, name="tag2"),
+            ]
+        )
 
         r1.tags.add(t1)
         r2.tags.add(t2)
@@ -462,20 +504,40 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        recipes = Recipe.objects.filter(id__in=[r1.id, r2.id])
+        expected = RecipeSerializer(
+            recipes.prefetch_related("tags", "ingredients"), many=True
+        ).data
+        actual = {recipe["id"]: recipe for recipe in res.data["results"]}
+        self.assertEqual(len(actual), 2)
+        for recipe in expected:
+            self.assertEqual(actual[recipe["id"]], recipe)
+        self.assertNotIn(r3.id, actual)
+
+    def test_filter_by_tags_unique(self):
+        """Test that a recipe matching several tags is returned once"""
+        recipe = create_recipe(user=self.user)
+        t1 = Tag.objects.create(user=self.user, name="tag1")
+        t2 = Tag.objects.create(user=self.user, name="tag2")
+        recipe.tags.add(t1, t2)
+
+        params = {"tags": f"{t1.id}, {t2.id}"}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
 
     def test_filter_by_ingredients(self):
         """Test that filtering ingredients works"""
-        r1 = create_recipe(user=self.user, title="recipe1")
-        r2 = create_recipe(user=self.user, title="recipe2")
-        r3 = create_recipe(user=self.user, title="recipe3")
-        i1 = Ingredient.objects.create(user=self.user, name="ingredient1")
-        i2 = Ingredient.objects.create(user=self.user, name="ingredient2")
+        r1, r2, r3 = Recipe.objects.bulk_create(
+            [build_recipe(self.user, title=f"recipe{i}") for i in (1, 2, 3)]
+        )
+        i1, i2 = Ingredient.objects.bulk_create(
+            [
+                Ingredient(user=self.user, name="ingredient1"),
+                Ingredient(user=self.user, name="ingredient2"),
+            ]
+        )
 
         r1.ingredients.add(i1)
         r2.ingredients.add(i2)
@@ -485,24 +547,34 @@ class PrivateRecipeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        recipes = Recipe.objects.filter(id__in=[r1.id, r2.id])
+        expected = RecipeSerializer(
+            recipes.prefetch_related("tags", "ingredients"), many=True
+        ).data
+        actual = {recipe["id"]: recipe for recipe in res.data["results"]}
+        self.assertEqual(len(actual), 2)
+        for recipe in expected:
+            self.assertEqual(actual[recipe["id"]], recipe)
+        self.assertNotIn(r3.id, actual)
 
 
 class ImageUploadTests(TestCase):
     """Tests for the image upload API."""
 
-    def setUp(self) -> None:
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             "user@example.com", "password123"
         )
+        cls.recipe = create_recipe(user=cls.user)
+        buffer = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(buffer, format="JPEG")
+        cls.jpeg_bytes = buffer.getvalue()
+
+    def setUp(self) -> None:
         self.client.force_authenticate(self.user)
-        self.recipe = create_recipe(user=self.user)
 
     def tearDown(self) -> None:
         self.recipe.image.delete()
@@ -510,17 +582,17 @@ class ImageUploadTests(TestCase):
     def test_upload_image(self):
         """Test uploading an image to a recipe"""
         url = image_upload_url(self.recipe.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpeg") as image_file:
-            img = Image.new("RGB", (10, 10))
-            img.save(image_file, format="JPEG")
-            image_file.seek(0)
-            payload = {"image": image_file}
-            res = self.client.post(url, payload, format="multipart")
+        image_file = SimpleUploadedFile(
+            "image.jpeg", self.jpeg_bytes, content_type="image/jpeg"
+        )
+        payload = {"image": image_file}
+        res = self.client.post(url, payload, format="multipart")
 
         self.recipe.refresh_from_db()
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn("image", res.data)
-        self.assertTrue(os.path.exists(self.recipe.image.path))
+        image = self.recipe.image
+        self.assertTrue(image.storage.exists(image.name))
 
     def test_upload_image_bad_request(self):
         """Test uploading an invalid image"""
@@ -0,0 +1,40 @@
+"""
+Tests for recipe serializer fields.
+"""
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from recipe.serializers import PriceField
+
+
+class PriceFieldTests(SimpleTestCase):
+    """Test rendering prices with PriceField"""
+
+    def test_quantized_price(self):
+        """Test a price already at the field's scale renders as is"""
+        field = PriceField(max_digits=5, decimal_places=2)
+
+        self.assertEqual(field.to_representation(Decimal("5.25")), "5.25")
+
+    def test_unquantized_price(self):
+        """Test prices at another scale are quantized first"""
+        field = PriceField(max_digits=5, decimal_places=2)
+
+        self.assertEqual(field.to_representation(Decimal("5.2")), "5.20")
+        self.assertEqual(field.to_representation(Decimal("1E+2")), "100.00")
+
+    def test_price_not_coerced_to_string(self):
+        """Test coerce_to_string=False still returns Decimals"""
+        field = PriceField(
+            max_digits=5, decimal_places=2, coerce_to_string=False
+        )
+
+        self.assertEqual(
+            field.to_representation(Decimal("5.25")), Decimal("5.25")
+        )
+        self.assertIsInstance(
+            field.to_representation(Decimal("5.25")), Decimal
+        )
+        self.assertEqual(
+            field.to_representation(Decimal("5.2")), Decimal("5.20")
+        )
@@ -7,27 +7,39 @@ from core.models import Recipe, Tag
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
-from recipe.serializers import TagSerializer
 from rest_framework import status
 from rest_framework.test import APIClient
 
 TAGS_URL = reverse("recipe:tag-list")
+# Reversed once with a placeholder id that tag_detail_url() swaps out.
+TAG_DETAIL_URL = reverse("recipe:tag-detail", args=[0]).replace("/0/", "/{}/")
 
 
 def tag_detail_url(tag_id):
     """Create and return tag detail"""
-    return reverse("recipe:tag-detail", args=[tag_id])
+    return TAG_DETAIL_URL.format(tag_id)
 
 
 def create_user(email="test@example.com", password="Test123"):
     return get_user_model().objects.create_user(email=email, password=password)
 
 
+def create_recipes_titled(user, *titles):
+    """Create and return a sample recipe per title in a single query"""
+    return Recipe.objects.bulk_create(
+        [
+            Recipe(
+                user=user, title=title, price=Decimal("2.30"), time_minutes=30
+            )
+            for title in titles
+        ]
+    )
+
+
 class PublicTagsApiTests(TestCase):
     """Test unauthenticated api requests"""
 
-    def setUp(self) -> None:
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         """Test auth is required to continue"""
@@ -39,23 +51,31 @@ class PublicTagsApiTests(TestCase):
 class PrivateTagsApiTests(TestCase):
     """Test authenticated api requests"""
 
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
     def setUp(self) -> None:
-        self.user = create_user()
-        self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
     def test_retrieve_tags(self):
         """Test retrieve a list  of tags"""
-        Tag.objects.create(user=self.user, name="Vegan")
-        Tag.objects.create(user=self.user, name="Dessert")
-
-        res = self.client.get(TAGS_URL)
+        vegan = Tag.objects.create(user=self.user, name="Vegan")
+        dessert = Tag.objects.create(user=self.user, name="Dessert")
 
-        tags = Tag.objects.all().order_by("-name")
-        serializer = TagSerializer(tags, many=True)
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {"id": vegan.id, "name": "Vegan"},
+                {"id": dessert.id, "name": "Dessert"},
+            ],
+        )
 
     def test_tags_limited_to_user(self):
         """Test retrieved tags are limited to the authenticated users only"""
@@ -63,18 +83,18 @@ class PrivateTagsApiTests(TestCase):
 
         Tag.objects.create(user=user2, name="Gluten Free")
         Tag.objects.create(user=user2, name="Starter")
-        Tag.objects.create(user=self.user, name="Vegan")
+        vegan = Tag.objects.create(user=self.user, name="Vegan")
         tag = Tag.objects.create(user=self.user, name="Dessert")
         res = self.client.get(TAGS_URL)
 
-        tags = Tag.objects.all().filter(user=self.user).order_by("-name")
-        serializer = TagSerializer(tags, many=True)
-
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
-        self.assertEqual(len(res.data), 2)
-        self.assertEqual(res.data[1]["name"], tag.name)
-        self.assertEqual(res.data[1]["id"], tag.id)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {"id": vegan.id, "name": "Vegan"},
+                {"id": tag.id, "name": "Dessert"},
+            ],
+        )
 
     def test_update_tag(self):
         """Tet update tag works"""
@@ -96,62 +116,45 @@ class PrivateTagsApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
 
-        tags = Tag.objects.filter(user=self.user)
-        self.assertFalse(tags.exists())
+        self.assertFalse(Tag.objects.filter(pk=tag.id).exists())
 
     def test_tag_in_use_filter(self):
         """Testing that only the tags in use are returned"""
-        t1 = Tag.objects.create(user=self.user, name="tag one")
-        t2 = Tag.objects.create(user=self.user, name="tag two")
-        t3 = Tag.objects.create(user=self.user, name="tag three")
-        r1 = Recipe.objects.create(
-            user=self.user,
-            title="recipe one",
-            price=Decimal("2.30"),
-            time_minutes=30,
-        )
-        r2 = Recipe.objects.create(
-            user=self.user,
-            title="recipe two",
-            price=Decimal("2.30"),
-            time_minutes=30,
+        t1, t2, _ = Tag.objects.bulk_create(
+            [
+                Tag(user=self.user, name="tag one"),
+                Tag(user=self.user, name="tag two"),
+                Tag(user=self.user, name="tag three"),
+            ]
         )
+        r1, r2 = create_recipes_titled(self.user, "recipe one", "recipe two")
 
         r1.tags.add(t1)
         r2.tags.add(t2)
 
-        s1 = TagSerializer(t1)
-        s2 = TagSerializer(t2)
-        s3 = TagSerializer(t3)
-
         params = {"assigned_only": 1}
-        res = self.client.get(TAGS_URL, params)
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL, params)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertEqual(
+            {tag["id"] for tag in res.data["results"]}, {t1.id, t2.id}
+        )
 
     def test_tags_unique(self):
         """testing that filtering tags does not return duplicates"""
-        t1 = Tag.objects.create(user=self.user, name="tag one")
-        Tag.objects.create(user=self.user, name="tag two")
-        r1 = Recipe.objects.create(
-            user=self.user,
-            title="recipe one",
-            price=Decimal("2.30"),
-            time_minutes=30,
-        )
-        r2 = Recipe.objects.create(
-            user=self.user,
-            title="recipe two",
-            price=Decimal("2.30"),
-            time_minutes=30,
+        t1, _ = Tag.objects.bulk_create(
+            [
+                Tag(user=self.user, name="tag one"),
+                Tag(user=self.user, name="tag two"),
+            ]
         )
+        r1, r2 = create_recipes_titled(self.user, "recipe one", "recipe two")
 
         r1.tags.add(t1)
         r2.tags.add(t1)
 
         params = {"assigned_only": 1}
-        res = self.client.get(TAGS_URL, params)
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL, params)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
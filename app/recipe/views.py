@@ -3,6 +3,7 @@ Views for the Recipe Apis
 """
 
 from core.models import Ingredient, Recipe, Tag
+from django.db.models import Exists, OuterRef, Prefetch
 from drf_spectacular.utils import (
     OpenApiParameter,
     OpenApiTypes,
@@ -10,6 +11,10 @@ from drf_spectacular.utils import (
     extend_schema_view,
 )
 from recipe import serializers
+from recipe.pagination import (
+    RecipeAttrCursorPagination,
+    RecipeCursorPagination,
+)
 from rest_framework import mixins, status, viewsets
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
@@ -40,6 +45,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
 
     def _params_to_ints(self, qs):
         """Conversta a list of strings to integers"""
@@ -52,18 +58,37 @@ class RecipeViewSet(viewsets.ModelViewSet):
         queryset = self.queryset
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            tagged = Recipe.tags.through.objects.filter(tag_id__in=tag_ids)
+            queryset = queryset.filter(pk__in=tagged.values("recipe_id"))
         if ingredients:
             ingredients_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredients_ids)
-
-        return (
-            queryset.filter(user=self.request.user).order_by("-id").distinct()
+            with_ingredients = Recipe.ingredients.through.objects.filter(
+                ingredient_id__in=ingredients_ids
+            )
+            queryset = queryset.filter(
+                pk__in=with_ingredients.values("recipe_id")
+            )
+
+        queryset = queryset.filter(user=self.request.user).order_by("-id")
+        if self.action == "list":
+            # The list serializer never reads description or image.
+            queryset = queryset.only(
+                "id", "title", "time_minutes", "price", "link"
+            )
+        elif self.action in ("upload_image", "destroy"):
+            return queryset.defer("description")
+
+        # Nested tag/ingredient serializers only render id and name.
+        return queryset.prefetch_related(
+            Prefetch("tags", queryset=Tag.objects.only("id", "name")),
+            Prefetch(
+                "ingredients", queryset=Ingredient.objects.only("id", "name")
+            ),
         )
 
     def get_serializer_class(self):
         if self.action == "list":
-            return serializers.RecipeSerializer
+            return serializers.RecipeListSerializer
         elif self.action == "upload_image":
             return serializers.RecipeImageSerializer
 
@@ -108,19 +133,19 @@ class BaseRecipeAttrViewSet(
 
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeAttrCursorPagination
 
     def get_queryset(self):
         """Filter queryset to authenticated user"""
         assigned = bool(int(self.request.query_params.get("assigned_only", 0)))
         queryset = self.queryset
         if assigned:
-            queryset = queryset.filter(recipe__isnull=False)
+            in_use = self.recipe_through.objects.filter(
+                **{self.queryset.model._meta.model_name: OuterRef("pk")}
+            )
+            queryset = queryset.filter(Exists(in_use))
 
-        return (
-            queryset.filter(user=self.request.user)
-            .order_by("-name")
-            .distinct()
-        )
+        return queryset.filter(user=self.request.user).order_by("-name", "-id")
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
@@ -128,6 +153,7 @@ class TagViewSet(BaseRecipeAttrViewSet):
 
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
+    recipe_through = Recipe.tags.through
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
@@ -135,3 +161,4 @@ class IngredientViewSet(BaseRecipeAttrViewSet):
 
     serializer_class = serializers.IngredientSerializer
     queryset = Ingredient.objects.all()
+    recipe_through = Recipe.ingredients.through